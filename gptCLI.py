@@ -1,13 +1,25 @@
 #!/usr/bin/env python3
 import curses
 import curses.textpad
+from dataclasses import dataclass
 import re
 import os
+import secrets
+import select
 import subprocess
-from gptInterpreter import ChatGPTClient
+import tempfile
+import threading
+import time
 
 API_KEY_FILENAME = "apikey.txt"
 
+# Regexes used on the render and response paths, compiled once.
+_KEY_RE = re.compile(r'^(\s*\S+:)')
+_HEADER_RE = re.compile(r'^\s*(Status:|Desc:|Next:)')
+# Zero-width match at the start of any header line, for commenting those lines out.
+_HEADER_LINE_START_RE = re.compile(r'^(?=\s*(?:Status:|Desc:|Next:))', re.MULTILINE)
+_RESPONSE_RE = re.compile(r"Status:\s*(.*?)\nDesc:\s*(.*?)\nNext:\s*(.*?)\nCode:\s*(.*)", re.DOTALL)
+
 # Define the system prompt once.
 SYSTEM_PROMPT = """You are an advanced YAML-to-Python code converter. Your task is to:
 
@@ -22,6 +34,68 @@ Next: <any required modifications such as API specifications, URLs, API keys, or
 Code: <the complete, syntactically correct Python code>
 """
 
+# Raised by stream_response when the user presses ESC while a response streams in.
+class CompileCancelled(Exception):
+    pass
+
+@dataclass
+class CompileResult:
+    """
+    A ChatGPT compile response split into its Status/Desc/Next/Code parts.
+    `raw` keeps the full response text.
+    """
+    status: str
+    desc: str
+    next: str
+    code: str
+    raw: str
+
+    @property
+    def header(self):
+        """
+        The header text shown after a compile.
+        """
+        if self.status or self.desc or self.next:
+            return f"Status: {self.status}\nDesc: {self.desc}\nNext: {self.next}"
+        return self.raw.partition("Code:")[0].strip()
+
+def _parse_response(raw):
+    """
+    Parses a compile response once into a CompileResult. Responses that do not
+    follow the Status/Desc/Next/Code format keep an empty header and whatever
+    follows "Code:" as the code.
+    """
+    match = _RESPONSE_RE.search(raw)
+    if match:
+        return CompileResult(status=match.group(1).strip(), desc=match.group(2).strip(),
+                             next=match.group(3).strip(), code=match.group(4).strip(), raw=raw)
+    _, sep, code = raw.partition("Code:")
+    code = code.strip() if sep else ""
+    return CompileResult(status="", desc="", next="", code=code, raw=raw)
+
+def _new_client(api_key):
+    """
+    Creates a ChatGPTClient. gptInterpreter (and with it the openai SDK) is only
+    imported here, on the first compile, so starting the editor does not pay for it.
+    """
+    from gptInterpreter import ChatGPTClient
+    return ChatGPTClient(api_key=api_key)
+
+def _start_encoding_preload():
+    """
+    Loads tiktoken's encoding on a daemon thread while the user is still typing, so
+    the first compile does not wait for the BPE tables. Nothing is imported on the
+    main thread. Failures (e.g. offline) are ignored; the first request then loads
+    the encoding itself.
+    """
+    def preload():
+        try:
+            from gptInterpreter import preload_encoding
+            preload_encoding()
+        except Exception:
+            pass
+    threading.Thread(target=preload, daemon=True).start()
+
 def init_colors():
     curses.start_color()
     curses.use_default_colors()
@@ -37,18 +111,21 @@ def init_colors():
     else:
         curses.init_pair(6, curses.COLOR_WHITE, -1)
 
-def highlight_line(win, y, line, offset=0):
+def highlight_line(win, y, line, offset=0, max_width=None):
     """
     Render a single line with rudimentary YAML syntax highlighting.
       - YAML keys (leading non-space text ending with a colon) appear in blue.
       - Comments (starting with '#') appear in green.
-    Rendering begins at the given horizontal offset.
+    Rendering begins at the given horizontal offset. If max_width is given, the
+    line is clipped to that many characters before anything is drawn.
     """
+    if max_width is not None:
+        line = line[:max_width]
     x = offset
     comment_index = line.find('#')
     if comment_index != -1:
         pre_comment = line[:comment_index]
-        m = re.match(r'^(\s*\S+:)', pre_comment)
+        m = _KEY_RE.match(pre_comment)
         if m:
             key_text = m.group(1)
             win.addstr(y, x, key_text, curses.color_pair(1))
@@ -61,7 +138,7 @@ def highlight_line(win, y, line, offset=0):
         comment_text = line[comment_index:]
         win.addstr(y, x, comment_text, curses.color_pair(4))
     else:
-        m = re.match(r'^(\s*\S+:)', line)
+        m = _KEY_RE.match(line)
         if m:
             key_text = m.group(1)
             win.addstr(y, x, key_text, curses.color_pair(1))
@@ -79,7 +156,8 @@ def get_user_input(stdscr, prompt):
     win = curses.newwin(3, width - 4, height // 2 - 1, 2)
     win.border()
     win.addstr(1, 2, prompt, curses.color_pair(2))
-    win.refresh()
+    # Staged only: the Textbox flushes it with its first refresh.
+    win.noutrefresh()
     input_win = curses.newwin(1, width - len(prompt) - 10, height // 2, len(prompt) + 4)
     box = curses.textpad.Textbox(input_win)
     curses.curs_set(1)
@@ -96,6 +174,7 @@ def show_help(stdscr):
     help_text = (
         "Available commands:\n"
         ";compile         - Compile the YAML via ChatGPTClient\n"
+        ";batchcompile    - Compile each '---' separated YAML document in one request\n"
         ";execute         - Compile then immediately run the generated code\n"
         ";run             - Execute the code section from last compile\n"
         ";savepy <filename>- Save generated Python code (from last compile) to a file\n"
@@ -111,55 +190,381 @@ def show_help(stdscr):
     for i, line in enumerate(lines):
         if i < height - 1:
             stdscr.addstr(i, 0, line)
-    stdscr.refresh()
+    stdscr.noutrefresh()
+    curses.doupdate()
     stdscr.getch()
     stdscr.clear()
 
-def run_code_section(stdscr, code_str):
+def _show_status(stdscr, cmd_win, text, attr, width):
+    """
+    Shows a one-line message in the command bar, clipped to the terminal width,
+    and waits for a key press.
+    """
+    cmd_win.erase()
+    cmd_win.addstr(0, 0, text[:width - 1], attr)
+    cmd_win.refresh()
+    stdscr.getch()
+
+class CodeRunner:
+    """
+    Keeps one python3 worker process alive and runs scripts inside it, so repeated
+    runs skip interpreter startup. Each script runs as __main__ in a fresh namespace;
+    its combined stdout/stderr is returned. The worker is restarted if it dies, a
+    run exceeds the timeout, or a script leaves something writing after it ends.
+    Where pipes cannot be polled with select() (Windows), each run uses a fresh
+    process instead.
+    """
+    SELECT_PIPES = os.name != "nt"
+
+    # Worker loop: read "<nonce> <script path>" per line from the parent, run the
+    # script, then print an end marker carrying the nonce, so no script output can
+    # fake it. Like interpreter exit, the run waits for the script's non-daemon
+    # threads; daemon threads still running take the worker down with them.
+    # The script's own stdin is /dev/null so it cannot eat commands.
+    DRIVER = r"""
+import os, runpy, sys, threading, traceback
+commands = os.fdopen(os.dup(0), "r")
+os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+cwd = os.getcwd()
+for line in commands:
+    nonce, path = line.rstrip("\n").split(" ", 1)
+    sys.argv = [path]
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is not None and not isinstance(e.code, int):
+            print(e.code, file=sys.stderr)
+    except BaseException as e:
+        # Drop the driver/runpy frames so the traceback starts in the script.
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != path:
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb)
+    for thread in threading.enumerate():
+        if thread is not threading.main_thread() and not thread.daemon:
+            thread.join()
+    sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    os.chdir(cwd)
+    sys.stdout.write("\n<<<DONE " + nonce + ">>>\n")
+    sys.stdout.flush()
+    if threading.active_count() > 1:
+        os._exit(0)
+"""
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self.proc = None
+
+    def _start(self):
+        self.proc = subprocess.Popen(["python3", "-u", "-c", self.DRIVER],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT)
+
+    def run(self, path, on_output=None):
+        """
+        Runs the script at `path` in the worker and returns its output.
+        If `on_output` is given, it is called with each new piece of output (whole
+        lines where possible) as soon as the worker writes it.
+        Raises subprocess.TimeoutExpired (and kills the worker) after `timeout` seconds.
+        """
+        if not self.SELECT_PIPES:
+            return self._run_once(path, on_output)
+        if self.proc is not None and select.select([self.proc.stdout], [], [], 0)[0]:
+            # Output (or EOF) arrived after the previous run ended; start over rather
+            # than mix it into this run.
+            self.close()
+        nonce = secrets.token_hex(8)
+        command = f"{nonce} {os.path.abspath(path)}\n".encode()
+        try:
+            if self.proc is None or self.proc.poll() is not None:
+                self._start()
+            self.proc.stdin.write(command)
+            self.proc.stdin.flush()
+        except BrokenPipeError:
+            self._start()
+            self.proc.stdin.write(command)
+            self.proc.stdin.flush()
+        marker = f"\n<<<DONE {nonce}>>>\n".encode()
+        output = b""
+        emitted = 0
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close()
+                raise subprocess.TimeoutExpired(path, self.timeout)
+            ready, _, _ = select.select([self.proc.stdout], [], [], remaining)
+            if not ready:
+                continue
+            data = os.read(self.proc.stdout.fileno(), 65536)
+            if not data:
+                # The worker exited (e.g. os._exit); start a new one next run.
+                self.proc = None
+                end = len(output)
+                break
+            output += data
+            end = output.find(marker)
+            if end != -1:
+                if len(output) > end + len(marker):
+                    # Something is still writing after the script finished.
+                    self.close()
+                break
+            if on_output is not None:
+                # Hold back the last newline: it may be the start of the end marker.
+                limit = output.rfind(b"\n")
+                if limit > emitted:
+                    on_output(output[emitted:limit].decode(errors="replace"))
+                    emitted = limit
+        if on_output is not None and end > emitted:
+            on_output(output[emitted:end].decode(errors="replace"))
+        return output[:end].decode(errors="replace")
+
+    def _run_once(self, path, on_output=None):
+        """
+        Runs the script in a new python3 process and returns its output, which is
+        only available once the process exits.
+        """
+        result = subprocess.run(["python3", path], stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                timeout=self.timeout)
+        output = result.stdout.decode(errors="replace")
+        if on_output is not None and output:
+            on_output(output)
+        return output
+
+    def close(self):
+        """
+        Stops the worker process, if one is running.
+        """
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+def _write_file(path, data, mode=None):
+    """
+    Writes a small text file with raw os.open/os.write, skipping Python's
+    buffered text I/O layers. Without `mode` a new file gets the same permissions
+    open() would give it. With `mode` the file ends up with exactly that mode, even
+    if it already existed (0o600 keeps the API key file private).
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666 if mode is None else mode)
+    if mode is not None and hasattr(os, "fchmod"):
+        # O_CREAT's mode only applies to new files; fix up an existing one before
+        # anything is written to it.
+        try:
+            os.fchmod(fd, mode)
+        except OSError:
+            os.close(fd)
+            raise
+    _write_fd(fd, data)
+
+def _write_fd(fd, data):
+    """
+    Writes all of `data` to the open file descriptor `fd`, then closes it.
+    """
+    payload = data.encode()
+    try:
+        while payload:
+            payload = payload[os.write(fd, payload):]
+    finally:
+        os.close(fd)
+
+def _clean_code(code_str):
+    """
+    Removes markdown code fences and the leading header lines (Status:, Desc:,
+    Next:) from generated code; blank lines among them are skipped too. Any
+    header line found further down is commented out so it never runs as code.
+    """
+    code_str = code_str.replace("```python", "").replace("```", "")
+    lines = code_str.splitlines()
+    i = 0
+    while i < len(lines) and (not lines[i].strip() or _HEADER_RE.match(lines[i])):
+        i += 1
+    return _HEADER_LINE_START_RE.sub("#", "\n".join(lines[i:]))
+
+def _write_script(code_str):
+    """
+    Writes the code to a new temporary script and returns its path. The script
+    goes to tmpfs (/dev/shm) when available so short runs never touch the disk;
+    otherwise it is created in the current directory. mkstemp picks an unguessable
+    name and creates the file exclusively, so no other user can plant it first.
+    """
+    fd, temp_filename = tempfile.mkstemp(prefix="yaml2py_", suffix=".py",
+                                         dir="/dev/shm" if os.path.isdir("/dev/shm") else os.curdir)
+    _write_fd(fd, code_str)
+    return temp_filename
+
+def run_code_section(stdscr, code_str, runner):
     """
     Saves the provided code (assumed to be Python code) to a temporary file,
-    after removing markdown code block markers, executes it, captures its output,
-    and displays that output in the current window.
-    Before saving, any header lines (Status:, Desc:, Next:) are filtered out.
+    after removing markdown code block markers, executes it in the persistent
+    worker of `runner`, and displays its output in the current window as it
+    is produced.
+    Before saving, any leading header lines (Status:, Desc:, Next:) are removed.
     Press ';' to exit and return to the editor.
     """
-    # Remove markdown code fences if present
-    code_str = code_str.replace("```python", "").replace("```", "")
-    
-    # Filter out any header lines starting with "Status:", "Desc:", or "Next:"
-    filtered_lines = []
-    for line in code_str.splitlines():
-        if re.match(r'^\s*(Status:|Desc:|Next:)', line):
-            filtered_lines.append("#" + line)
-        else:
-            filtered_lines.append(line)
-    code_str = "\n".join(filtered_lines)
-    
-    temp_filename = "temp_code.py"
-    with open(temp_filename, "w") as f:
-        f.write(code_str)
-    try:
-        result = subprocess.run(["python3", temp_filename],
-                                capture_output=True, text=True, timeout=10)
-        output = result.stdout + "\n" + result.stderr
-    except Exception as e:
-        output = f"Error executing code: {str(e)}"
+    temp_filename = _write_script(_clean_code(code_str))
+
+    height, width = stdscr.getmaxyx()
+    # Output lines so far; the last entry is the partial line still being written.
+    lines = [""]
+
+    def _show_output(piece):
+        # Only the new piece is split; its first part extends the partial last line.
+        for part in piece.splitlines(True):
+            text = part.splitlines()[0]
+            lines[-1] += text
+            if text != part:
+                lines.append("")
+        # Redraw the tail of the output that fits between the title and footer.
+        end = len(lines) - 1 if lines[-1] == "" else len(lines)
+        for i, line in enumerate(lines[max(0, end - (height - 3)):end]):
+            stdscr.move(i + 2, 0)
+            stdscr.clrtoeol()
+            try:
+                stdscr.addstr(i + 2, 0, line[:width - 1])
+            except curses.error:
+                pass
+        stdscr.noutrefresh()
+        curses.doupdate()
+
     stdscr.clear()
     stdscr.addstr(0, 0, "Code Execution Output:", curses.color_pair(1))
-    stdscr.addstr(2, 0, output)
-    stdscr.addstr(curses.LINES - 1, 0, "Press ';' to return to the editor.", curses.color_pair(2))
-    stdscr.refresh()
+    stdscr.addstr(height - 1, 0, "Running...", curses.color_pair(2))
+    stdscr.noutrefresh()
+    curses.doupdate()
+    try:
+        runner.run(temp_filename, on_output=_show_output)
+    except Exception as e:
+        _show_output(("\n" if lines != [""] else "") + f"Error executing code: {str(e)}")
+    finally:
+        os.remove(temp_filename)
+    stdscr.move(height - 1, 0)
+    stdscr.clrtoeol()
+    stdscr.addstr(height - 1, 0, "Press ';' to return to the editor.", curses.color_pair(2))
+    stdscr.noutrefresh()
+    curses.doupdate()
     while True:
         k = stdscr.getch()
         if k == ord(';'):
             break
     stdscr.clear()
 
+def stream_response(stdscr, client, prompt_text):
+    """
+    Streams a ChatGPT response on a background thread while the screen shows a
+    spinner and the text received so far. Returns the full response text.
+    Pressing ESC closes the stream and raises CompileCancelled.
+    """
+    chunks = []
+    errors = []
+    lock = threading.Lock()
+    cancel = threading.Event()
+
+    def _consumer():
+        stream = client.get_response_stream(prompt_text=prompt_text, system_prompt=SYSTEM_PROMPT)
+        try:
+            for piece in stream:
+                if cancel.is_set():
+                    break
+                with lock:
+                    chunks.append(piece)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            stream.close()
+
+    worker = threading.Thread(target=_consumer, daemon=True)
+    worker.start()
+
+    height, width = stdscr.getmaxyx()
+    spinner = "|/-\\"
+    frame = 0
+    rendered = -1
+    stdscr.nodelay(True)
+    try:
+        while worker.is_alive():
+            with lock:
+                received = len(chunks)
+                text = "".join(chunks) if received != rendered else None
+            if text is not None:
+                # Show the tail of the response that fits between the title and footer.
+                stdscr.erase()
+                for i, line in enumerate(text.splitlines()[-(height - 3):]):
+                    try:
+                        stdscr.addstr(i + 2, 0, line[:width - 1])
+                    except curses.error:
+                        pass
+                rendered = received
+            stdscr.addstr(0, 0, f"Compiling {spinner[frame % len(spinner)]}", curses.color_pair(1))
+            stdscr.addstr(height - 1, 0, "Press ESC to cancel.", curses.color_pair(2))
+            stdscr.noutrefresh()
+            curses.doupdate()
+            frame += 1
+            if stdscr.getch() == 27:
+                cancel.set()
+                raise CompileCancelled()
+            curses.napms(50)
+    finally:
+        stdscr.nodelay(False)
+
+    if errors:
+        raise errors[0]
+    return "".join(chunks).strip()
+
+class GapBuffer:
+    """
+    Gap buffer for the line being edited. Characters left of the cursor are kept
+    in order in `left` and characters right of it in reverse order in `right`, so
+    inserting or deleting at the cursor is an O(1) list append/pop instead of
+    rebuilding the whole line string on every keystroke.
+    """
+    def __init__(self, text="", pos=0):
+        self.load(text, pos)
+
+    def __len__(self):
+        return len(self.left) + len(self.right)
+
+    def load(self, text, pos):
+        """
+        Replaces the contents with `text`, placing the gap at `pos`.
+        """
+        self.left = list(text[:pos])
+        self.right = list(reversed(text[pos:]))
+
+    def move_to(self, pos):
+        """
+        Moves the gap to `pos`, shifting only the characters in between.
+        """
+        while len(self.left) > pos:
+            self.right.append(self.left.pop())
+        while len(self.left) < pos and self.right:
+            self.left.append(self.right.pop())
+
+    def insert(self, ch):
+        self.left.append(ch)
+
+    def delete_before(self):
+        self.left.pop()
+
+    def split(self):
+        """
+        Removes and returns the text right of the gap (used for Enter).
+        """
+        tail = "".join(reversed(self.right))
+        self.right = []
+        return tail
+
+    def to_string(self):
+        return "".join(self.left) + "".join(reversed(self.right))
+
 def run_editor(stdscr, api_key):
     """
     Runs the full-screen YAML editor with line numbers, manual cursor drawing,
     and a command bar. Command mode is entered by pressing ";". Commands:
       ;compile         - Compile the YAML via ChatGPTClient.
+      ;batchcompile    - Compile each '---' separated YAML document in one request.
       ;execute         - Compile then immediately run the generated code.
       ;run             - Execute the code section from last compile.
       ;savepy <filename>- Save generated Python code (from last compile) to a file.
@@ -183,11 +588,34 @@ def run_editor(stdscr, api_key):
 
     # Initialize text buffer (list of lines)
     buffer = [""]
+    # Length of every buffer line, kept in lockstep with buffer so navigation
+    # reads an int from a list instead of measuring strings.
+    line_lengths = [0]
     cursor_y, cursor_x = 0, 0
     scroll_offset = 0
 
-    # Last compile response stored for running code.
-    last_compile_response = None
+    # The row under the cursor is edited in a gap buffer and written back to
+    # buffer once per frame, before rendering, when line_dirty is set.
+    line_buf = GapBuffer(buffer[0], 0)
+    line_row = 0
+    line_dirty = False
+
+    # Last compile result stored for running code.
+    last_compile_result = None
+
+    # Buffer version, bumped on every edit. It keys the joined-prompt cache and
+    # the last compile so an unchanged buffer is neither rejoined nor resent.
+    buf_version = 0
+    joined_cache = (-1, "")
+    last_compile = (-1, None)  # (buf_version, CompileResult)
+
+    # One client for the whole session so its HTTP connections stay warm
+    # between commands. Created on first use and dropped when the key changes.
+    client = None
+    _start_encoding_preload()
+
+    # Persistent python3 worker shared by ;run and ;execute.
+    runner = CodeRunner()
 
     # Modes: "insert" (normal editing) or "command" (entering a command)
     mode = "insert"
@@ -195,97 +623,212 @@ def run_editor(stdscr, api_key):
     
     # Render the editor once before entering the loop to fix initial blank display.
     editor_win.erase()
-    editor_win.refresh()
+    editor_win.noutrefresh()
     cmd_win.erase()
-    cmd_win.refresh()
+    cmd_win.noutrefresh()
+    curses.doupdate()
+
+    # Dirty-region tracking: only buffer rows listed in dirty_lines are repainted
+    # each frame. full_redraw repaints the whole editor (scrolling, resize, commands).
+    dirty_lines = set()
+    full_redraw = True
+    prev_scroll_offset = scroll_offset
+    # Screen cell of the drawn cursor and the attributes it had before being
+    # reversed, so a cursor move only has to touch the old and new cells.
+    prev_cursor_cell = None
+    prev_cursor_attr = curses.A_NORMAL
+
+    def _handle_key(key):
+        """
+        Applies one insert-mode key (or a terminal resize) to the buffer and cursor
+        and marks what needs repainting. Rendering is left to the main loop so a
+        burst of queued keys is rendered once.
+        """
+        nonlocal mode, command_str, cursor_y, cursor_x, buf_version, line_row, line_dirty, full_redraw
+        nonlocal height, width, editor_height
+        if key == curses.KEY_RESIZE:
+            # The terminal size is only re-read here; the existing windows are
+            # resized in place rather than recreated.
+            height, width = stdscr.getmaxyx()
+            editor_height = height - 1
+            editor_win.resize(editor_height, width)
+            cmd_win.resize(1, width)
+            cmd_win.mvwin(editor_height, 0)
+            full_redraw = True
+            return
+        if key == ord(';'):
+            mode = "command"
+            command_str = ";"
+        elif key in (curses.KEY_BACKSPACE, 127):
+            if cursor_x > 0:
+                line_buf.move_to(cursor_x)
+                line_buf.delete_before()
+                line_dirty = True
+                line_lengths[cursor_y] -= 1
+                cursor_x -= 1
+                buf_version += 1
+                dirty_lines.add(cursor_y)
+            elif cursor_y > 0:
+                prev_line = buffer[cursor_y - 1]
+                # The gap buffer may hold edits to this row not yet written back.
+                current_line = line_buf.to_string()
+                buffer.pop(cursor_y)
+                current_length = line_lengths.pop(cursor_y)
+                cursor_y -= 1
+                cursor_x = line_lengths[cursor_y]
+                buffer[cursor_y] = prev_line + current_line
+                line_lengths[cursor_y] += current_length
+                line_buf.load(buffer[cursor_y], cursor_x)
+                line_row = cursor_y
+                line_dirty = False
+                buf_version += 1
+                # Every line below the join shifts up by one.
+                dirty_lines.update(range(cursor_y, scroll_offset + editor_height))
+        elif key in (curses.KEY_ENTER, 10, 13):
+            line_buf.move_to(cursor_x)
+            new_line = line_buf.split()
+            buffer[cursor_y] = line_buf.to_string()
+            buffer.insert(cursor_y+1, new_line)
+            line_lengths[cursor_y] = cursor_x
+            line_lengths.insert(cursor_y+1, len(new_line))
+            buf_version += 1
+            # Every line from the split point down shifts by one.
+            dirty_lines.update(range(cursor_y, scroll_offset + editor_height))
+            cursor_y += 1
+            cursor_x = 0
+            line_buf.load(new_line, 0)
+            line_row = cursor_y
+            line_dirty = False
+        elif key == curses.KEY_LEFT:
+            if cursor_x > 0:
+                cursor_x -= 1
+            elif cursor_y > 0:
+                cursor_y -= 1
+                cursor_x = line_lengths[cursor_y]
+        elif key == curses.KEY_RIGHT:
+            if cursor_x < line_lengths[cursor_y]:
+                cursor_x += 1
+            elif cursor_y < len(buffer) - 1:
+                cursor_y += 1
+                cursor_x = 0
+        elif key == curses.KEY_UP:
+            if cursor_y > 0:
+                cursor_y -= 1
+                cursor_x = min(cursor_x, line_lengths[cursor_y])
+        elif key == curses.KEY_DOWN:
+            if cursor_y < len(buffer) - 1:
+                cursor_y += 1
+                cursor_x = min(cursor_x, line_lengths[cursor_y])
+        elif 0 <= key <= 255:
+            line_buf.move_to(cursor_x)
+            line_buf.insert(chr(key))
+            line_dirty = True
+            line_lengths[cursor_y] += 1
+            cursor_x += 1
+            buf_version += 1
+            dirty_lines.add(cursor_y)
+        # Moving to another row: write back the old one and load the new one.
+        if cursor_y != line_row:
+            if line_dirty:
+                buffer[line_row] = line_buf.to_string()
+                line_dirty = False
+            line_buf.load(buffer[cursor_y], cursor_x)
+            line_row = cursor_y
+
+    def _joined_buffer():
+        """
+        Returns the buffer as a single string, rejoining it only after edits.
+        """
+        nonlocal joined_cache
+        if joined_cache[0] != buf_version:
+            joined_cache = (buf_version, "\n".join(buffer))
+        return joined_cache[1]
 
     while True:
+        if line_dirty:
+            buffer[line_row] = line_buf.to_string()
+            line_dirty = False
+
         # Render editor area
-        editor_win.erase()
-        visible_lines = buffer[scroll_offset:scroll_offset+editor_height]
-        for i, line in enumerate(visible_lines):
+        if scroll_offset != prev_scroll_offset:
+            full_redraw = True
+            prev_scroll_offset = scroll_offset
+        visible_range = range(scroll_offset, scroll_offset + editor_height)
+        if full_redraw:
+            # Flush anything a command left on stdscr before painting over it.
+            stdscr.noutrefresh()
+            editor_win.erase()
+            rows = visible_range
+        else:
+            # Erase the old block cursor by restoring that one cell's attributes.
+            if prev_cursor_cell is not None:
+                try:
+                    editor_win.chgat(prev_cursor_cell[0], prev_cursor_cell[1], 1, prev_cursor_attr)
+                except curses.error:
+                    pass
+            # Empty when only the cursor moved: no line is re-rendered.
+            rows = sorted(dirty_lines.intersection(visible_range))
+        for row in rows:
+            i = row - scroll_offset
+            if not full_redraw:
+                editor_win.move(i, 0)
+                editor_win.clrtoeol()
+            if row >= len(buffer):
+                continue
             # Draw line numbers in gray (right-aligned)
-            line_number = i + scroll_offset + 1
-            line_no = f"{line_number:>{line_no_width}} "  # e.g. "  1 "
+            line_no = f"{row + 1:>{line_no_width}} "  # e.g. "  1 "
             try:
                 editor_win.addstr(i, 0, line_no, curses.color_pair(6))
             except curses.error:
                 pass
             try:
-                highlight_line(editor_win, i, line, offset=line_no_width + 1)
+                highlight_line(editor_win, i, buffer[row], offset=line_no_width + 1,
+                               max_width=width - line_no_width - 2)
             except curses.error:
                 pass
+        dirty_lines.clear()
+        full_redraw = False
 
-        # Manually draw the cursor as a block at its position
+        # Manually draw the cursor as a reverse-video block at its position
         cur_screen_y = cursor_y - scroll_offset
         cur_screen_x = cursor_x + line_no_width + 1
+        prev_cursor_cell = None
         if 0 <= cur_screen_y < editor_height and 0 <= cur_screen_x < width:
             try:
-                editor_win.addch(cur_screen_y, cur_screen_x, ' ', curses.A_REVERSE)
+                prev_cursor_attr = editor_win.inch(cur_screen_y, cur_screen_x) & curses.A_ATTRIBUTES
+                editor_win.chgat(cur_screen_y, cur_screen_x, 1, prev_cursor_attr | curses.A_REVERSE)
+                prev_cursor_cell = (cur_screen_y, cur_screen_x)
             except curses.error:
                 pass
 
-        editor_win.refresh()
+        editor_win.noutrefresh()
 
         # Render command bar depending on mode.
         cmd_win.erase()
         if mode == "insert":
             cmd_msg = "Insert mode (press ';' to enter command mode). Arrows: Navigate | Enter: New line | Backspace: Delete"
-            cmd_win.addstr(0, 0, cmd_msg, curses.color_pair(2))
+            cmd_win.addstr(0, 0, cmd_msg[:width - 1], curses.color_pair(2))
         elif mode == "command":
             disclaimer = "   (Command mode: type ;help for commands)"
-            cmd_win.addstr(0, 0, command_str + disclaimer, curses.color_pair(2))
-        cmd_win.refresh()
+            cmd_win.addstr(0, 0, (command_str + disclaimer)[:width - 1], curses.color_pair(2))
+        cmd_win.noutrefresh()
+
+        # Push both windows to the terminal in a single update.
+        curses.doupdate()
 
         key = stdscr.getch()
 
-        if mode == "insert":
-            if key == ord(';'):
-                mode = "command"
-                command_str = ";"
-            elif key in (curses.KEY_BACKSPACE, 127):
-                if cursor_x > 0:
-                    line = buffer[cursor_y]
-                    buffer[cursor_y] = line[:cursor_x-1] + line[cursor_x:]
-                    cursor_x -= 1
-                elif cursor_y > 0:
-                    prev_line = buffer[cursor_y - 1]
-                    current_line = buffer.pop(cursor_y)
-                    cursor_y -= 1
-                    cursor_x = len(prev_line)
-                    buffer[cursor_y] = prev_line + current_line
-            elif key in (curses.KEY_ENTER, 10, 13):
-                line = buffer[cursor_y]
-                new_line = line[cursor_x:]
-                buffer[cursor_y] = line[:cursor_x]
-                buffer.insert(cursor_y+1, new_line)
-                cursor_y += 1
-                cursor_x = 0
-            elif key == curses.KEY_LEFT:
-                if cursor_x > 0:
-                    cursor_x -= 1
-                elif cursor_y > 0:
-                    cursor_y -= 1
-                    cursor_x = len(buffer[cursor_y])
-            elif key == curses.KEY_RIGHT:
-                if cursor_x < len(buffer[cursor_y]):
-                    cursor_x += 1
-                elif cursor_y < len(buffer) - 1:
-                    cursor_y += 1
-                    cursor_x = 0
-            elif key == curses.KEY_UP:
-                if cursor_y > 0:
-                    cursor_y -= 1
-                    cursor_x = min(cursor_x, len(buffer[cursor_y]))
-            elif key == curses.KEY_DOWN:
-                if cursor_y < len(buffer) - 1:
-                    cursor_y += 1
-                    cursor_x = min(cursor_x, len(buffer[cursor_y]))
-            elif 0 <= key <= 255:
-                ch = chr(key)
-                line = buffer[cursor_y]
-                buffer[cursor_y] = line[:cursor_x] + ch + line[cursor_x:]
-                cursor_x += 1
+        if mode == "insert" or key == curses.KEY_RESIZE:
+            _handle_key(key)
+            # Drain keys already queued (e.g. key repeat) without rendering in
+            # between, so a burst costs one frame instead of one per key.
+            stdscr.nodelay(True)
+            while mode == "insert":
+                key = stdscr.getch()
+                if key == -1:
+                    break
+                _handle_key(key)
+            stdscr.nodelay(False)
         elif mode == "command":
             if key in (curses.KEY_ENTER, 10, 13):
                 command = command_str.lstrip(';').strip()
@@ -293,37 +836,32 @@ def run_editor(stdscr, api_key):
                     mode = "insert"
                     command_str = ""
                     continue
+                # Commands may draw over the editor or replace the buffer.
+                full_redraw = True
                 parts = command.split()
                 cmd = parts[0].lower()
                 args = parts[1:]
                 if cmd == "execute":
-                    yaml_prompt = "\n".join(buffer)
                     try:
-                        client = ChatGPTClient(api_key=api_key)
-                        response = client.get_response(
-                            prompt_text=yaml_prompt,
-                            system_prompt=SYSTEM_PROMPT
-                        )
-                        last_compile_response = response
-                        # Parse the response into its header and code parts.
-                        match = re.search(r"Status:\s*(.*?)\nDesc:\s*(.*?)\nNext:\s*(.*?)\nCode:\s*(.*)", response, re.DOTALL)
-                        if match:
-                            status_text = match.group(1).strip()
-                            desc_text = match.group(2).strip()
-                            next_text = match.group(3).strip()
-                            header_text = f"Status: {status_text}\nDesc: {desc_text}\nNext: {next_text}"
-                            code_section = match.group(4).strip()
+                        if last_compile[0] == buf_version:
+                            # Buffer unchanged since the last compile: reuse its result.
+                            result = last_compile[1]
                         else:
-                            header_text = response.split("Code:")[0].strip() if "Code:" in response else response.strip()
-                            code_section = response.split("Code:")[1].strip() if "Code:" in response else ""
+                            if client is None:
+                                client = _new_client(api_key)
+                            result = _parse_response(stream_response(stdscr, client, _joined_buffer()))
+                            last_compile = (buf_version, result)
+                        last_compile_result = result
                         stdscr.clear()
                         stdscr.addstr(0, 0, "Compile Result:", curses.color_pair(1))
-                        stdscr.addstr(2, 0, header_text)
+                        stdscr.addstr(2, 0, result.header)
                         stdscr.addstr(height - 1, 0, "Press any key to execute the code.", curses.color_pair(2))
                         stdscr.refresh()
                         stdscr.getch()
-                        if code_section:
-                            run_code_section(stdscr, code_section)
+                        if result.code:
+                            run_code_section(stdscr, result.code, runner)
+                    except CompileCancelled:
+                        pass
                     except Exception as e:
                         stdscr.clear()
                         stdscr.addstr(0, 0, f"Error during execute: {str(e)}", curses.color_pair(3))
@@ -331,125 +869,129 @@ def run_editor(stdscr, api_key):
                         stdscr.refresh()
                         stdscr.getch()
                 elif cmd == "compile":
-                    yaml_prompt = "\n".join(buffer)
                     try:
-                        client = ChatGPTClient(api_key=api_key)
-                        response = client.get_response(
-                            prompt_text=yaml_prompt,
-                            system_prompt=SYSTEM_PROMPT
-                        )
-                        last_compile_response = response
-                        if "Code:" in response:
-                            match = re.search(r"Status:\s*(.*?)\nDesc:\s*(.*?)\nNext:\s*(.*?)\nCode:\s*(.*)", response, re.DOTALL)
-                            if match:
-                                status_text = match.group(1).strip()
-                                desc_text = match.group(2).strip()
-                                next_text = match.group(3).strip()
-                                header_text = f"Status: {status_text}\nDesc: {desc_text}\nNext: {next_text}"
-                            else:
-                                header_text = response.split("Code:")[0].strip()
+                        if last_compile[0] == buf_version:
+                            # Buffer unchanged since the last compile: reuse its result.
+                            result = last_compile[1]
                         else:
-                            header_text = response.strip()
+                            if client is None:
+                                client = _new_client(api_key)
+                            result = _parse_response(stream_response(stdscr, client, _joined_buffer()))
+                            last_compile = (buf_version, result)
+                        last_compile_result = result
                         stdscr.clear()
                         stdscr.addstr(0, 0, "Compile Result:", curses.color_pair(1))
-                        stdscr.addstr(2, 0, header_text)
+                        stdscr.addstr(2, 0, result.header)
                         stdscr.addstr(height - 1, 0, "Press any key to return to the editor.", curses.color_pair(2))
                         stdscr.refresh()
                         stdscr.getch()
+                    except CompileCancelled:
+                        pass
                     except Exception as e:
                         stdscr.clear()
                         stdscr.addstr(0, 0, f"Error during compile: {str(e)}", curses.color_pair(3))
                         stdscr.addstr(height - 1, 0, "Press any key to return to the editor.", curses.color_pair(2))
                         stdscr.refresh()
                         stdscr.getch()
-                elif cmd == "run":
-                    if last_compile_response and "Code:" in last_compile_response:
-                        match = re.search(r"Code:\s*(.*)", last_compile_response, re.DOTALL)
-                        if match:
-                            code_section = match.group(1).strip()
+                elif cmd == "batchcompile":
+                    # Split the buffer into YAML documents on "---" separator lines.
+                    documents = []
+                    current = []
+                    for line in buffer:
+                        if line.strip() == "---":
+                            documents.append("\n".join(current))
+                            current = []
                         else:
-                            code_section = ""
-                        run_code_section(stdscr, code_section)
+                            current.append(line)
+                    documents.append("\n".join(current))
+                    documents = [doc for doc in documents if doc.strip()]
+                    if not documents:
+                        _show_status(stdscr, cmd_win, "No YAML documents to compile.", curses.color_pair(3), width)
                     else:
-                        cmd_win.erase()
-                        cmd_win.addstr(0, 0, "No code section available from last compile.", curses.color_pair(3))
-                        cmd_win.refresh()
-                        stdscr.getch()
+                        try:
+                            if client is None:
+                                client = _new_client(api_key)
+                            # One API request for every document in the buffer.
+                            responses = client.get_responses(documents, system_prompt=SYSTEM_PROMPT)
+                            stdscr.clear()
+                            stdscr.addstr(0, 0, f"Batch Compile Result ({len(responses)} documents):", curses.color_pair(1))
+                            row = 2
+                            for i, response in enumerate(responses):
+                                result = _parse_response(response)
+                                if result.status:
+                                    header_text = f"Status: {result.status}\nDesc: {result.desc}"
+                                else:
+                                    header_text = result.header or "No response."
+                                for text in [f"Document {i + 1}:"] + header_text.splitlines():
+                                    if row >= height - 1:
+                                        break
+                                    try:
+                                        stdscr.addstr(row, 0, text[:width - 1])
+                                    except curses.error:
+                                        pass
+                                    row += 1
+                                row += 1
+                            stdscr.addstr(height - 1, 0, "Press any key to return to the editor.", curses.color_pair(2))
+                            stdscr.refresh()
+                            stdscr.getch()
+                        except Exception as e:
+                            stdscr.clear()
+                            stdscr.addstr(0, 0, f"Error during batch compile: {str(e)}", curses.color_pair(3))
+                            stdscr.addstr(height - 1, 0, "Press any key to return to the editor.", curses.color_pair(2))
+                            stdscr.refresh()
+                            stdscr.getch()
+                elif cmd == "run":
+                    if last_compile_result and last_compile_result.code:
+                        run_code_section(stdscr, last_compile_result.code, runner)
+                    else:
+                        _show_status(stdscr, cmd_win, "No code section available from last compile.", curses.color_pair(3), width)
                 elif cmd == "savepy" and args:
-                    if last_compile_response and "Code:" in last_compile_response:
-                        match = re.search(r"Code:\s*(.*)", last_compile_response, re.DOTALL)
-                        if match:
-                            code_section = match.group(1).strip()
-                        else:
-                            code_section = ""
-                        # Remove markdown code fences if present
-                        code_section = code_section.replace("```python", "").replace("```", "")
-                        # Remove any header lines (Status:, Desc:, Next:) from the code section.
-                        code_section = "\n".join(line for line in code_section.splitlines() if not re.match(r'^\s*(Status:|Desc:|Next:)', line))
+                    if last_compile_result and last_compile_result.code:
+                        code_section = _clean_code(last_compile_result.code)
                         filename = " ".join(args)
-                        with open(filename, "w") as f:
-                            f.write(code_section)
-                        cmd_win.erase()
-                        cmd_win.addstr(0, 0, f"Python code saved to '{filename}'.", curses.color_pair(1))
-                        cmd_win.refresh()
-                        stdscr.getch()
+                        _write_file(filename, code_section)
+                        _show_status(stdscr, cmd_win, f"Python code saved to '{filename}'.", curses.color_pair(1), width)
                     else:
-                        cmd_win.erase()
-                        cmd_win.addstr(0, 0, "No code available from last compile.", curses.color_pair(3))
-                        cmd_win.refresh()
-                        stdscr.getch()
+                        _show_status(stdscr, cmd_win, "No code available from last compile.", curses.color_pair(3), width)
                 elif cmd == "open" and args:
                     filename = " ".join(args)
                     if os.path.exists(filename):
                         with open(filename, "r") as f:
                             content = f.read()
                         buffer = content.splitlines() or [""]
+                        line_lengths = [len(line) for line in buffer]
+                        line_buf.load(buffer[0], 0)
+                        line_row = 0
+                        buf_version += 1
                         cursor_y, cursor_x = 0, 0
                     else:
-                        cmd_win.erase()
-                        cmd_win.addstr(0, 0, f"File '{filename}' not found.", curses.color_pair(3))
-                        cmd_win.refresh()
-                        stdscr.getch()
+                        _show_status(stdscr, cmd_win, f"File '{filename}' not found.", curses.color_pair(3), width)
                 elif cmd == "save" and args:
                     filename = " ".join(args)
-                    with open(filename, "w") as f:
-                        f.write("\n".join(buffer))
-                    cmd_win.erase()
-                    cmd_win.addstr(0, 0, f"Saved to '{filename}'.", curses.color_pair(1))
-                    cmd_win.refresh()
-                    stdscr.getch()
+                    _write_file(filename, _joined_buffer())
+                    _show_status(stdscr, cmd_win, f"Saved to '{filename}'.", curses.color_pair(1), width)
                 elif cmd == "deletekey":
                     if os.path.exists(API_KEY_FILENAME):
                         os.remove(API_KEY_FILENAME)
-                        cmd_win.erase()
-                        cmd_win.addstr(0, 0, "API key file deleted.", curses.color_pair(3))
-                        cmd_win.refresh()
-                        stdscr.getch()
+                        _show_status(stdscr, cmd_win, "API key file deleted.", curses.color_pair(3), width)
                         api_key = ""
+                        client = None
                     else:
-                        cmd_win.erase()
-                        cmd_win.addstr(0, 0, "No API key file found.", curses.color_pair(3))
-                        cmd_win.refresh()
-                        stdscr.getch()
+                        _show_status(stdscr, cmd_win, "No API key file found.", curses.color_pair(3), width)
                 elif cmd == "rekey":
                     new_key = get_user_input(stdscr, "Enter new API key: ")
                     if new_key:
                         api_key = new_key
-                        with open(API_KEY_FILENAME, "w") as f:
-                            f.write(api_key)
-                        cmd_win.erase()
-                        cmd_win.addstr(0, 0, "API key updated and saved.", curses.color_pair(1))
-                        cmd_win.refresh()
-                        stdscr.getch()
+                        client = None
+                        _write_file(API_KEY_FILENAME, api_key, mode=0o600)
+                        _show_status(stdscr, cmd_win, "API key updated and saved.", curses.color_pair(1), width)
                 elif cmd == "help":
                     show_help(stdscr)
                 elif cmd == "exit":
+                    runner.close()
                     return
                 else:
-                    cmd_win.erase()
-                    cmd_win.addstr(0, 0, f"Unknown command: {command}", curses.color_pair(3))
-                    cmd_win.refresh()
-                    stdscr.getch()
+                    _show_status(stdscr, cmd_win, f"Unknown command: {command}", curses.color_pair(3), width)
                 mode = "insert"
                 command_str = ""
             elif key in (27,):  # ESC cancels command mode
@@ -495,8 +1037,7 @@ def main(stdscr):
         api_box = curses.textpad.Textbox(api_input_win)
         curses.curs_set(1)
         api_key = api_box.edit().strip()
-        with open(API_KEY_FILENAME, "w") as f:
-            f.write(api_key)
+        _write_file(API_KEY_FILENAME, api_key, mode=0o600)
 
     run_editor(stdscr, api_key)
 
@@ -1,12 +1,186 @@
 # chatgpt_client.py
-from openai import OpenAI
+import asyncio
+import importlib
 import os
-import tiktoken
+import re
+import threading
+import weakref
+from functools import lru_cache
+from typing import Iterator, Union
+
+# OpenAI clients shared by every ChatGPTClient using the same API key, so their
+# HTTP connection pools (and keep-alive TLS sessions) are reused.
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+# Connection pool size for the HTTP clients handed to the SDK; smaller pools
+# serialize larger fan-outs.
+_MAX_CONNECTIONS = 100
+_MAX_KEEPALIVE_CONNECTIONS = 50
+
+def _pooled_http_client(asynchronous: bool = False):
+    """
+    Returns an HTTP client with a larger connection pool for the openai SDK, built on
+    whichever HTTP library the installed SDK uses (httpx2 or httpx). Returns None, so
+    the SDK keeps its own client, if that library cannot be determined.
+    HTTP/2 is only enabled when the optional 'h2' package is installed.
+    """
+    import openai
+    client_cls = getattr(openai, "DefaultAsyncHttpxClient" if asynchronous else "DefaultHttpxClient", None)
+    if client_cls is None:
+        return None
+    # Limits must come from the same library as the SDK's client class.
+    for name in ("httpx2", "httpx"):
+        try:
+            http = importlib.import_module(name)
+        except ImportError:
+            continue
+        if issubclass(client_cls, http.AsyncClient if asynchronous else http.Client):
+            break
+    else:
+        return None
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    return client_cls(
+        limits=http.Limits(
+            max_connections=_MAX_CONNECTIONS,
+            max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        http2=http2,
+        timeout=60.0
+    )
+
+def _get_client(api_key: str):
+    """
+    Returns the shared OpenAI client for an API key, creating it on first use.
+    """
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(api_key)
+            if client is None:
+                # Imported here so that loading this module does not pull in the openai SDK.
+                from openai import OpenAI
+                client = _CLIENTS[api_key] = OpenAI(
+                    api_key=api_key,
+                    max_retries=2,
+                    timeout=60.0,
+                    http_client=_pooled_http_client()
+                )
+    return client
+
+# Async clients are bound to the event loop they were created on, so they are kept
+# per loop and key, and closed when that loop shuts down. Loops are only weakly
+# referenced, and the entries of a loop that was closed without finalizing its async
+# generators (e.g. run_until_complete followed by loop.close()) are dropped.
+_LOOP_RESOURCES = weakref.WeakKeyDictionary()
+
+async def _close_with_loop(resources, key, resource):
+    """
+    Yields `resource` once, then closes it when the generator is finalized. asyncio.run
+    finalizes pending async generators (loop.shutdown_asyncgens) while the loop is
+    still running, which is what ties the resource's lifetime to its loop.
+    """
+    try:
+        yield resource
+    finally:
+        resources.pop(key, None)
+        await resource.close()
+
+async def _loop_bound(key, factory):
+    """
+    Returns the resource stored under `key` for the running event loop, creating it
+    with factory() on first use. The resource is closed when the loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    for other in list(_LOOP_RESOURCES):
+        if other.is_closed():
+            _LOOP_RESOURCES.pop(other, None)
+    resources = _LOOP_RESOURCES.setdefault(loop, {})
+    entry = resources.get(key)
+    if entry is None:
+        resource = factory()
+        closer = _close_with_loop(resources, key, resource)
+        # Starting the generator registers it with the loop for finalization.
+        await closer.__anext__()
+        entry = resources[key] = (resource, closer)
+    return entry[0]
+
+class ChatAPIError(Exception):
+    """
+    Raised by aget_response_raw when the chat completions endpoint returns an error.
+    `status` is the HTTP status and `code` the API error code (None if not given).
+    """
+    def __init__(self, status: int, code: str = None, message: str = None):
+        super().__init__(message or code or f"HTTP {status}")
+        self.status = status
+        self.code = code
+
+# Used when a caller leaves out the prompt or the system prompt.
+_DEFAULT_PROMPT = "Return: PROMPT NOT PROVIDED: PLEASE CHECK YOUR INPUT PARAMETERS"
+_DEFAULT_SYSTEM_PROMPT = _DEFAULT_PROMPT
+
+# Encodings of the models this client is normally used with, resolved without going
+# through tiktoken's model-name matching.
+_MODEL_TO_ENCODING = {
+    "gpt-4": "cl100k_base",
+    "gpt-3.5-turbo": "cl100k_base",
+    "gpt-4o": "o200k_base",
+}
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """
+    Returns the tiktoken encoding for a model, loading its BPE tables only once
+    per model. Models missing from _MODEL_TO_ENCODING are resolved by tiktoken, and
+    names it does not know fall back to the cl100k_base encoding.
+    """
+    # Imported here so that importing this module, or sending requests that never
+    # need an exact token count, does not load tiktoken.
+    import tiktoken
+    encoding_name = _MODEL_TO_ENCODING.get(model)
+    if encoding_name is not None:
+        return tiktoken.get_encoding(encoding_name)
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def preload_encoding(model: str = "gpt-4") -> None:
+    """
+    Loads the tiktoken encoding for a model and runs one encode, so the first request
+    that needs an exact token count does not pay for parsing the BPE tables. Nothing
+    is loaded at import time; long-running callers can call this once at startup.
+    """
+    _get_encoding(model).encode_ordinary("warmup")
 
 class ChatGPTClient:
-    MAX_CONTEXT_TOKENS = 8192  # Maximum tokens allowed in the model's context
+    MAX_CONTEXT_TOKENS = 8192  # Maximum tokens allowed in the context of models not listed below
     CONTEXT_MARGIN = 10        # Extra tokens reserved to avoid overshooting the limit
     MESSAGE_OVERHEAD = 3       # Estimated overhead per message (for role markers and formatting)
+    CHARS_PER_TOKEN_ESTIMATE = 3  # Conservative characters-per-token ratio for the cheap pre-check
+    RESPONSE_CACHE_SIZE = 256  # Number of get_response replies remembered per client
+
+    # Context window sizes, in tokens, of models with a window other than the default.
+    _MODEL_CONTEXT = {
+        "gpt-4": 8192,
+        "gpt-4-turbo": 128000,
+        "gpt-4o": 128000,
+        "gpt-3.5-turbo": 16385,
+    }
+
+    # Appended to the system prompt when several documents share one request.
+    BATCH_INSTRUCTIONS = (
+        "\n\nThe user message contains several independent documents, each introduced by a "
+        "line of the form '--- DOC <i> ---'. Handle each document separately and begin the "
+        "response for document <i> with a line of the form '=== RESP <i> ===' on its own."
+    )
+    _RESP_MARKER_RE = re.compile(r"^=== RESP (\d+) ===[ \t]*$", re.MULTILINE)
+
+    CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
 
     def __init__(self, api_key: str = None):
         """
@@ -17,22 +191,122 @@ class ChatGPTClient:
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("API key must be provided or set as environment variable 'OPENAI_API_KEY'")
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = _get_client(self.api_key)
+        # Token counts of system prompts already seen, keyed by (system_prompt, model).
+        self._sys_token_cache = {}
+        # Memoized get_response replies, keyed by the full request.
+        self._cached_response = lru_cache(maxsize=self.RESPONSE_CACHE_SIZE)(self._fetch_response)
+
+    async def get_aclient(self):
+        """
+        Returns the AsyncOpenAI client used by the async methods. One client is shared
+        per API key and event loop, and closed when that loop shuts down, so separate
+        asyncio.run() calls never share a connection pool.
+        """
+        from openai import AsyncOpenAI
+        return await _loop_bound(("openai", self.api_key), lambda: AsyncOpenAI(
+            api_key=self.api_key,
+            max_retries=2,
+            timeout=60.0,
+            http_client=_pooled_http_client(asynchronous=True)
+        ))
 
     def count_tokens(self, text: str, model: str) -> int:
         """
         Uses tiktoken to count tokens for a given text according to the specified model.
+        Special-token markers such as '<|endoftext|>' are counted as ordinary text, which
+        is also how the API treats them inside message content.
+        """
+        return len(_get_encoding(model).encode_ordinary(text))
+
+    def _allowed_response_tokens(
+        self, prompt_text: str, model: str, max_tokens: int, system_prompt: str, use_estimate: bool = True
+    ) -> int:
+        """
+        Returns how many response tokens can be requested so that input plus response
+        stays within the model's maximum context. Raises ValueError if none are left.
+        With use_estimate=False the cheap character-based pre-check is skipped.
+        """
+        max_context = self._max_context(model)
+        overhead = 2 * self.MESSAGE_OVERHEAD + self.CONTEXT_MARGIN
+
+        # Exact upper bound: every token covers at least one UTF-8 byte, and a character
+        # is at most 4 bytes (exactly 1 for ASCII). If even that bound fits, no count is needed.
+        char_len = len(system_prompt) + len(prompt_text)
+        byte_bound = char_len if system_prompt.isascii() and prompt_text.isascii() else 4 * char_len
+        if byte_bound + max_tokens + overhead <= max_context:
+            return max_tokens
+
+        # Cheap pre-check: if a character-based estimate leaves at least 20% of the
+        # context unused, the request almost certainly fits, so skip tiktoken. The rare
+        # miss is caught by the server and retried through _retry_response_tokens.
+        if use_estimate:
+            estimated_total = char_len // self.CHARS_PER_TOKEN_ESTIMATE + max_tokens + overhead
+            if estimated_total < max_context * 0.8:
+                return max_tokens
+
+        # The system prompt is usually the same on every call, so its count is cached
+        # and only the user prompt needs tokenizing.
+        key = (system_prompt, model)
+        system_tokens = self._sys_token_cache.get(key)
+        if system_tokens is None:
+            system_tokens = self._sys_token_cache[key] = self.count_tokens(system_prompt, model)
+        return self._response_budget(system_tokens, self.count_tokens(prompt_text, model), max_tokens, model)
+
+    def _retry_response_tokens(
+        self, exc: Exception, sent_tokens: int, prompt_text: str, model: str, max_tokens: int, system_prompt: str
+    ) -> int:
+        """
+        Called when a completion request fails. If the server rejected it for exceeding
+        the context length and the exact token count allows a smaller budget than the
+        one sent, returns that budget for a retry. Otherwise re-raises the error.
         """
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
+        from openai import BadRequestError
+        if not isinstance(exc, BadRequestError) or getattr(exc, "code", None) != "context_length_exceeded":
+            raise exc
+        exact_tokens = self._allowed_response_tokens(prompt_text, model, max_tokens, system_prompt, use_estimate=False)
+        if exact_tokens >= sent_tokens:
+            raise exc
+        return exact_tokens
+
+    def _max_context(self, model: str) -> int:
+        """
+        Returns the context window size of a model, in tokens.
+        """
+        return self._MODEL_CONTEXT.get(model, self.MAX_CONTEXT_TOKENS)
+
+    def _response_budget(self, system_tokens: int, user_tokens: int, max_tokens: int, model: str) -> int:
+        """
+        Returns the response token budget for already-counted system and user messages.
+        Raises ValueError if none are left.
+        """
+        # Add overhead for each message (system and user).
+        total_input_tokens = system_tokens + user_tokens + 2 * self.MESSAGE_OVERHEAD
+
+        # Check if the input itself is already too large.
+        max_context = self._max_context(model)
+        if total_input_tokens >= max_context:
+            raise ValueError("The provided input messages exceed the maximum allowed context length.")
+
+        # Calculate available tokens for the completion, subtracting the safety margin.
+        available_response_tokens = max_context - total_input_tokens - self.CONTEXT_MARGIN
+        allowed_response_tokens = min(max_tokens, available_response_tokens)
+
+        if allowed_response_tokens < 1:
+            raise ValueError("Not enough tokens left for the response. Please shorten your input.")
+
+        return allowed_response_tokens
 
     def get_response(
         self,
-        prompt_text: str = "Return: PROMPT NOT PROVIDED: PLEASE CHECK YOUR INPUT PARAMETERS",
+        prompt_text: str = _DEFAULT_PROMPT,
         model: str = "gpt-4",
         max_tokens: int = 8000,  # user-requested maximum tokens for the response
-        system_prompt: str = "Return: PROMPT NOT PROVIDED: PLEASE CHECK YOUR INPUT PARAMETERS"
-    ) -> str:
+        system_prompt: str = _DEFAULT_SYSTEM_PROMPT,
+        stream: bool = False,
+        strip: bool = True,
+        cache: bool = True
+    ) -> Union[str, Iterator[str]]:
         """
         Sends a chat completion request to the ChatGPT API, ensuring that the total token count
         (input tokens plus response tokens) does not exceed the model's maximum context.
@@ -42,36 +316,272 @@ class ChatGPTClient:
         - model: The model to use (default: "gpt-4").
         - max_tokens: The maximum number of tokens for the response.
         - system_prompt: The system prompt that defines assistant behavior.
+        - stream: If True, return an iterator over the response text as it arrives
+          (see get_response_stream) instead of waiting for the whole reply.
+        - strip: If False, return the reply exactly as the model sent it, without
+          trimming leading and trailing whitespace.
+        - cache: If True, an identical earlier request made through this client returns
+          its remembered reply without calling the API. Streamed replies are never cached.
 
         Returns:
-        - The text response from the assistant.
+        - The text response from the assistant, or an iterator of text pieces if stream is True.
         """
-        # Count tokens for system and user messages using tiktoken.
-        system_tokens = self.count_tokens(system_prompt, model)
-        user_tokens = self.count_tokens(prompt_text, model)
-        # Add overhead for each message (system and user).
-        total_input_tokens = system_tokens + user_tokens + 2 * self.MESSAGE_OVERHEAD
+        if stream:
+            return self.get_response_stream(prompt_text, model, max_tokens, system_prompt)
+        if cache:
+            return self._cached_response(prompt_text, model, max_tokens, system_prompt, strip)
+        return self._fetch_response(prompt_text, model, max_tokens, system_prompt, strip)
 
-        # Check if the input itself is already too large.
-        if total_input_tokens >= self.MAX_CONTEXT_TOKENS:
-            raise ValueError("The provided input messages exceed the maximum allowed context length.")
+    def _fetch_response(self, prompt_text: str, model: str, max_tokens: int, system_prompt: str, strip: bool) -> str:
+        """
+        Requests a single reply from the API; wrapped by the per-instance response cache.
+        """
+        return self.get_responses([prompt_text], model, max_tokens, system_prompt, strip)[0]
 
-        # Calculate available tokens for the completion, subtracting the safety margin.
-        available_response_tokens = self.MAX_CONTEXT_TOKENS - total_input_tokens - self.CONTEXT_MARGIN
-        allowed_response_tokens = min(max_tokens, available_response_tokens)
+    async def aget_response(
+        self,
+        prompt_text: str = _DEFAULT_PROMPT,
+        model: str = "gpt-4",
+        max_tokens: int = 8000,  # user-requested maximum tokens for the response
+        system_prompt: str = _DEFAULT_SYSTEM_PROMPT,
+        strip: bool = True
+    ) -> str:
+        """
+        Async variant of get_response, backed by AsyncOpenAI. Several requests can be
+        awaited together with asyncio.gather(...) so their round trips overlap instead
+        of running one after another.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt_text}
+        ]
+        aclient = await self.get_aclient()
+        allowed_response_tokens = self._allowed_response_tokens(prompt_text, model, max_tokens, system_prompt)
+        try:
+            response = await aclient.chat.completions.create(
+                model=model, messages=messages, max_tokens=allowed_response_tokens
+            )
+        except Exception as exc:
+            retry_tokens = self._retry_response_tokens(
+                exc, allowed_response_tokens, prompt_text, model, max_tokens, system_prompt
+            )
+            response = await aclient.chat.completions.create(
+                model=model, messages=messages, max_tokens=retry_tokens
+            )
+        content = response.choices[0].message.content
+        return content.strip() if strip else content
 
-        if allowed_response_tokens < 1:
-            raise ValueError("Not enough tokens left for the response. Please shorten your input.")
+    @staticmethod
+    async def _get_aio_session():
+        """
+        Returns the aiohttp session shared by all instances on the running event loop.
+        It is created on first use and closed when the loop shuts down.
+        """
+        import aiohttp
+        return await _loop_bound("aiohttp", lambda: aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=_MAX_CONNECTIONS, limit_per_host=_MAX_CONNECTIONS),
+            timeout=aiohttp.ClientTimeout(total=60.0)
+        ))
+
+    async def _post_chat_completion(self, payload: dict) -> dict:
+        """
+        POSTs a chat completion payload with the shared aiohttp session and returns the
+        decoded JSON body. Raises ChatAPIError for unsuccessful responses and for bodies
+        that are not a JSON object.
+        """
+        session = await self._get_aio_session()
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        async with session.post(self.CHAT_COMPLETIONS_URL, json=payload, headers=headers) as resp:
+            try:
+                data = await resp.json(content_type=None)
+            except ValueError:
+                # Not JSON at all, e.g. an HTML error page from a proxy.
+                data = None
+            if resp.status >= 400:
+                error = (data.get("error") or {}) if isinstance(data, dict) else {}
+                raise ChatAPIError(resp.status, error.get("code"), error.get("message") or resp.reason)
+            if not isinstance(data, dict):
+                raise ChatAPIError(resp.status, None, resp.reason)
+        return data
 
-        response = self.client.chat.completions.create(
-            model=model,
-            messages=[
+    async def aget_response_raw(
+        self,
+        prompt_text: str = _DEFAULT_PROMPT,
+        model: str = "gpt-4",
+        max_tokens: int = 8000,  # user-requested maximum tokens for the response
+        system_prompt: str = _DEFAULT_SYSTEM_PROMPT,
+        strip: bool = True
+    ) -> str:
+        """
+        Same as aget_response, but POSTs to the chat completions endpoint directly with a
+        shared aiohttp session instead of going through the openai SDK. Meant for callers
+        that fan out many concurrent requests. Requires the optional 'aiohttp' package.
+        API errors are raised as ChatAPIError.
+        """
+        payload = {
+            "model": model,
+            "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt_text}
             ],
-            max_tokens=allowed_response_tokens
-        )
-        return response.choices[0].message.content.strip()
+            "max_tokens": self._allowed_response_tokens(prompt_text, model, max_tokens, system_prompt),
+        }
+        try:
+            data = await self._post_chat_completion(payload)
+        except ChatAPIError as exc:
+            if exc.code != "context_length_exceeded":
+                raise
+            exact_tokens = self._allowed_response_tokens(
+                prompt_text, model, max_tokens, system_prompt, use_estimate=False
+            )
+            if exact_tokens >= payload["max_tokens"]:
+                raise
+            payload["max_tokens"] = exact_tokens
+            data = await self._post_chat_completion(payload)
+        content = data["choices"][0]["message"]["content"]
+        return content.strip() if strip else content
+
+    @staticmethod
+    async def aclose_session():
+        """
+        Closes the running event loop's aiohttp session used by aget_response_raw, if
+        one is open, without waiting for the loop to shut down.
+        """
+        entry = _LOOP_RESOURCES.get(asyncio.get_running_loop(), {}).get("aiohttp")
+        if entry is not None:
+            await entry[1].aclose()
+
+    def get_responses_batch(
+        self,
+        prompts: list,
+        model: str = "gpt-4",
+        max_tokens: int = 8000,  # user-requested maximum tokens for each response
+        system_prompt: str = _DEFAULT_SYSTEM_PROMPT,
+        strip: bool = True
+    ) -> list:
+        """
+        Sends each prompt as its own chat completion request through aget_response and
+        issues all of them concurrently with asyncio.gather. Unlike get_responses, every
+        prompt keeps its own full response budget.
+
+        This runs its own event loop with asyncio.run, so it raises RuntimeError when
+        called from a running loop; async code should gather aget_response directly.
+
+        Returns:
+        - A list of text responses, in the same order as the prompts.
+        """
+        if not prompts:
+            return []
+
+        async def gather_responses():
+            return await asyncio.gather(*(
+                self.aget_response(prompt_text, model, max_tokens, system_prompt, strip)
+                for prompt_text in prompts
+            ))
+        return asyncio.run(gather_responses())
+
+    def get_response_stream(
+        self,
+        prompt_text: str = _DEFAULT_PROMPT,
+        model: str = "gpt-4",
+        max_tokens: int = 8000,  # user-requested maximum tokens for the response
+        system_prompt: str = _DEFAULT_SYSTEM_PROMPT
+    ):
+        """
+        Streaming variant of get_response. Yields the response text piece by piece as
+        the model produces it, so callers can display partial output while waiting.
+        Closing the generator closes the underlying HTTP stream.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt_text}
+        ]
+        allowed_response_tokens = self._allowed_response_tokens(prompt_text, model, max_tokens, system_prompt)
+        try:
+            stream = self.client.chat.completions.create(
+                model=model, messages=messages, max_tokens=allowed_response_tokens, stream=True
+            )
+        except Exception as exc:
+            retry_tokens = self._retry_response_tokens(
+                exc, allowed_response_tokens, prompt_text, model, max_tokens, system_prompt
+            )
+            stream = self.client.chat.completions.create(
+                model=model, messages=messages, max_tokens=retry_tokens, stream=True
+            )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+    def get_responses(
+        self,
+        prompts: list,
+        model: str = "gpt-4",
+        max_tokens: int = 8000,  # user-requested maximum tokens for the whole response
+        system_prompt: str = _DEFAULT_SYSTEM_PROMPT,
+        strip: bool = True
+    ) -> list:
+        """
+        Sends several prompts to the ChatGPT API in a single chat completion request.
+        The prompts are joined into one user message with '--- DOC i ---' delimiters and
+        the model is asked to prefix each answer with '=== RESP i ===', which is then
+        used to split the reply. A single prompt is sent unchanged.
+
+        Parameters:
+        - prompts: The text prompts, one per document.
+        - model: The model to use (default: "gpt-4").
+        - max_tokens: The maximum number of tokens for the combined response.
+        - system_prompt: The system prompt that defines assistant behavior.
+        - strip: If False, a single prompt's reply is returned without trimming
+          whitespace. Replies split out of a batch are always trimmed.
+
+        Returns:
+        - A list of text responses, in the same order as the prompts. A document the
+          model did not answer yields an empty string.
+        """
+        if not prompts:
+            return []
+        if len(prompts) == 1:
+            prompt_text = prompts[0]
+        else:
+            prompt_text = "\n".join(f"--- DOC {i} ---\n{p}" for i, p in enumerate(prompts))
+            system_prompt = system_prompt + self.BATCH_INSTRUCTIONS
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt_text}
+        ]
+        allowed_response_tokens = self._allowed_response_tokens(prompt_text, model, max_tokens, system_prompt)
+        try:
+            response = self.client.chat.completions.create(
+                model=model, messages=messages, max_tokens=allowed_response_tokens
+            )
+        except Exception as exc:
+            retry_tokens = self._retry_response_tokens(
+                exc, allowed_response_tokens, prompt_text, model, max_tokens, system_prompt
+            )
+            response = self.client.chat.completions.create(
+                model=model, messages=messages, max_tokens=retry_tokens
+            )
+        content = response.choices[0].message.content
+        if len(prompts) == 1:
+            return [content.strip() if strip else content]
+        return self._split_responses(content, len(prompts))
+
+    def _split_responses(self, content: str, count: int) -> list:
+        """
+        Splits a batched reply on its '=== RESP i ===' markers into `count` responses.
+        """
+        results = [""] * count
+        parts = self._RESP_MARKER_RE.split(content)
+        # parts alternates: [preamble, index, text, index, text, ...]
+        for index, text in zip(parts[1::2], parts[2::2]):
+            i = int(index)
+            if 0 <= i < count:
+                results[i] = text.strip()
+        return results
 
 # This block allows for testing the module directly.
 if __name__ == "__main__":